@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
 import streamlit as st  # uniquement pour le cache
 from unidecode import unidecode
 import gender_guesser.detector as gender
@@ -29,7 +34,12 @@ def add_gender(df):
 
 
 
-def compute_statistics(df: pd.DataFrame) -> dict:
+def compute_statistics(df: pd.DataFrame, geo: dict = None,
+                       barreau: str = 'Tous', geo_level: str = 'commune') -> dict:
+    """
+    KPI du tableau de bord. Si `geo` (cf. `compute_geo_rollups`) est fourni,
+    `concentration_geo` est lue au niveau `geo_level` au lieu d'être recalculée.
+    """
     total = len(df)
     stats = {}
     avg_exp = df['annees_experience'].mean() if total else 0
@@ -47,8 +57,11 @@ def compute_statistics(df: pd.DataFrame) -> dict:
     taux_renouvellement = (jeunes_diplomes / total * 100) if total else 0
 
     # Indice Herfindahl (concentration géographique)
-    counts = df['ville'].value_counts()
-    herf = (counts.div(total) ** 2).sum() * 100 if total else 0
+    if geo is not None:
+        herf = geo_concentration(geo, geo_level, barreau)
+    else:
+        counts = df['ville'].value_counts()
+        herf = (counts.div(total) ** 2).sum() * 100 if total else 0
 
     # --- nouvelles métriques ---
     # % sans spécialisation
@@ -111,8 +124,105 @@ def gini(array: np.ndarray) -> float:
     return diffs / (2 * n**2 * x.mean())
 
 
+def read_uploaded_file(uploaded, name: str = None) -> pd.DataFrame:
+    """Lit un export Excel / CSV (chemin, fichier Streamlit ou flux binaire)."""
+    name = name or getattr(uploaded, 'name', str(uploaded))
+    if name.lower().endswith('.csv'):
+        raw = pd.read_csv(uploaded)
+    else:
+        raw = pd.read_excel(uploaded)
+    raw.columns = [str(c).strip() for c in raw.columns]
+    return raw
+
+
+def _timed_read(name: str, data: bytes):
+    """Lecture dans un processus fils ; le temps mesuré est celui de ce fichier seul."""
+    start = time.perf_counter()
+    try:
+        raw = read_uploaded_file(io.BytesIO(data), name)
+    except Exception as e:
+        raise ValueError(f"{name} : {e}") from e
+    return raw, time.perf_counter() - start
+
+
+def _file_payload(f):
+    """(nom, octets) d'un fichier Streamlit ou d'un chemin, envoyable à un processus."""
+    if hasattr(f, 'getvalue'):
+        return f.name, f.getvalue()
+    return Path(f).name, Path(f).read_bytes()
+
+
+def _dedupe_key(df: pd.DataFrame) -> pd.DataFrame:
+    """Clé d'identité d'un avocat : nom normalisé + date de serment."""
+    nom = (df['nom_complet'].fillna('').astype(str)
+             .map(unidecode).str.lower()
+             .str.split().str.join(' '))
+    serment = pd.to_datetime(df['date_prestation_serment'], errors='coerce')
+    return pd.DataFrame({'nom': nom, 'serment': serment})
+
+
+def load_and_merge(files, max_workers: int = 4):
+    """
+    Lit plusieurs exports (un par barreau / région) en parallèle et les fusionne.
+
+    Chaque fichier est parsé dans un processus séparé (openpyxl garde le GIL).
+    Les colonnes sont alignées (union, NaN si absente d'un export) et un avocat
+    présent dans plusieurs exports (même nom, même date de serment connue)
+    n'est conservé qu'une fois. Les doublons internes à un même export ne
+    sont pas touchés.
+
+    Le résultat est mis en cache sur le contenu des fichiers : les reruns
+    Streamlit (filtres, expanders) ne relisent rien.
+
+    Retourne (DataFrame fusionné, DataFrame des temps de lecture par fichier).
+    Lève ValueError en précisant le fichier fautif si une lecture échoue.
+    """
+    payloads = tuple(_file_payload(f) for f in files)
+    return _parse_and_merge(payloads, max_workers)
+
+
+@st.cache_data(show_spinner=False)
+def _parse_and_merge(payloads: tuple, max_workers: int = 4):
+    names = [name for name, _ in payloads]
+    if len(payloads) == 1:
+        results = [_timed_read(*payloads[0])]
+    else:
+        workers = max(1, min(max_workers, len(payloads)))
+        # 'spawn' : pas de fork depuis le serveur Streamlit multithreadé
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_timed_read, *zip(*payloads)))
+
+    frames = []
+    timings = []
+    for i, (name, (raw, elapsed)) in enumerate(zip(names, results)):
+        frames.append(raw.assign(_source=i))
+        timings.append({
+            'fichier': name,
+            'lignes': len(raw),
+            'secondes': round(elapsed, 3),
+        })
+
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+    if {'nom_complet', 'date_prestation_serment'} <= set(merged.columns):
+        key = _dedupe_key(merged)
+        known = key['nom'].ne('') & key['serment'].notna()
+        # source du premier export où apparaît chaque avocat
+        first_source = (merged.loc[known, '_source']
+                              .groupby([key.loc[known, 'nom'], key.loc[known, 'serment']])
+                              .transform('first'))
+        dup = first_source.ne(merged.loc[known, '_source'])
+        merged = merged.drop(index=dup[dup].index)
+    merged = merged.drop(columns='_source').reset_index(drop=True)
+    return merged, pd.DataFrame(timings)
+
+
 @st.cache_data
-def process_data(df: pd.DataFrame) -> pd.DataFrame:
+def process_data(df: pd.DataFrame):
+    """
+    Prépare l'export brut. Retourne (DataFrame enrichi, rollups géographiques) :
+    les rollups sont calculés ici, dans l'étape déjà mise en cache sur `raw`.
+    """
     df = df.copy()
     # Langues (exclure 'Français')
     def parse_langues(val):
@@ -154,7 +264,8 @@ def process_data(df: pd.DataFrame) -> pd.DataFrame:
 
     df = add_gender(df)
     df = add_age_columns(df)
-    return df
+    df = add_geo_columns(df)
+    return df, compute_geo_rollups(df)
 
 
 
@@ -210,6 +321,9 @@ def prepare_chart_data(df: pd.DataFrame) -> dict:
 ############################################
 # data_utils.py  (à la suite de process_data)
 
+AGE_BRACKETS = ['<30', '30-39', '40-49', '50-59', '60+']
+
+
 def add_age_columns(df, today=None):
     """Ajoute seniority, age estimé et tranche d'âge."""
     if today is None:
@@ -222,8 +336,7 @@ def add_age_columns(df, today=None):
     )
     df['age_est'] = df['seniority_years'] + 27        # 27 ans ≈ âge moyen du serment
     bins = [0, 30, 40, 50, 60, np.inf]
-    labels = ['<30', '30-39', '40-49', '50-59', '60+']
-    df['age_bracket'] = pd.cut(df['age_est'], bins=bins, labels=labels)
+    df['age_bracket'] = pd.cut(df['age_est'], bins=bins, labels=AGE_BRACKETS)
     df['in_structure'] = (df['structure_reference'].notna() & df['structure_reference'].str.strip().ne('')) | (df.structure_reference.apply(lambda x: x.split()[0] == 'Individuel' if type(x) == str else False))
     df['is_specialised'] = df[['specialisations_1','specialisations_2','specialisations_3']].notna().any(axis=1)
     return df
@@ -248,6 +361,25 @@ def compute_age_insights(df):
     return struct, spec
 
 
+def compute_age_kpis(struct, spec) -> dict:
+    """
+    KPI de l'encart démographie, à partir des tables de `compute_age_insights`.
+
+    Une tranche absente (groupby `observed=True`) compte 0 avocat ; seuls les
+    ratios `%` d'une tranche vide valent NaN.
+    """
+    counts = struct[['Solo', 'Structure']].reindex(AGE_BRACKETS, fill_value=0)
+    struct = struct.reindex(AGE_BRACKETS)
+    spec = spec.reindex(AGE_BRACKETS)
+    # pourcentage de -30 ans
+    total = counts.sum().sum()
+    pct_jeunes = round(counts.loc['<30'].sum() / total * 100, 1) if total else np.nan
+    return {
+        'pct_jeunes': pct_jeunes,
+        'pct_structure_jeunes': struct.loc['<30', '% Structure'],
+        'pct_specialises_60plus': spec.loc['60+', '% Spécialisés'],
+    }
+
 
 ##########################################
 def prepare_flux_entree_data(df: pd.DataFrame,
@@ -271,3 +403,153 @@ def prepare_flux_entree_data(df: pd.DataFrame,
         "value": years.values,
     })
     return flux_df
+
+
+
+##########################################
+# Géographie : code postal → département → région
+
+GEO_INDEX_PATH = Path(__file__).parent / 'data' / 'geo_departements.csv'
+
+GEO_LEVELS = {
+    'commune': 'Ville',
+    'code_postal': 'Code Postal',
+    'departement': 'Département',
+    'region': 'Région',
+}
+
+
+@st.cache_data
+def load_geo_index() -> dict:
+    """
+    Charge une seule fois le référentiel département / région embarqué.
+
+    `dep_to_region[i]` donne le code entier de la région du département i,
+    ce qui permet de remonter d'un niveau par simple indexation numpy.
+    """
+    deps = pd.read_csv(GEO_INDEX_PATH, dtype=str)
+    region_codes, regions = pd.factorize(deps['code_region'])
+    region_names = deps.groupby('code_region', sort=False)['region'].first()
+    return {
+        'departements': deps['code_departement'].to_numpy(),
+        'departement_labels': (deps['code_departement'] + ' – '
+                               + deps['departement']).to_numpy(),
+        'region_labels': region_names.reindex(regions).to_numpy(),
+        'dep_to_region': region_codes,
+    }
+
+
+def normalise_code_postal(cp: pd.Series) -> pd.Series:
+    """Code postal sur 5 chiffres (str), NaN si invalide (6000.0 → '06000')."""
+    s = (cp.astype('string')
+           .str.replace(r'\.0$', '', regex=True)
+           .str.replace(r'\s', '', regex=True)
+           .str.zfill(5))
+    valid = s.str.fullmatch(r'\d{5}').fillna(False).astype(bool)
+    return s.astype(object).where(valid)
+
+
+def code_departement(cp: pd.Series) -> pd.Series:
+    """Département déduit du code postal (préfixe, Corse et outre-mer inclus)."""
+    dep = cp.str[:2]
+    outre_mer = dep.isin(['97', '98'])
+    dep = dep.where(~outre_mer, cp.str[:3])
+    corse = dep.eq('20')
+    corse_sud = cp.str[:3].isin(['200', '201'])
+    return dep.where(~corse, np.where(corse_sud, '2A', '2B'))
+
+
+def add_geo_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute code postal normalisé + codes entiers département / région (-1 = inconnu)."""
+    idx = load_geo_index()
+    df = df.copy()
+    df['code_postal_norm'] = normalise_code_postal(df['code_postal'])
+    deps = code_departement(df['code_postal_norm'])
+    dep_codes = pd.Categorical(deps, categories=idx['departements']).codes
+    df['geo_departement'] = dep_codes.astype(np.int32)
+    df['geo_region'] = np.where(
+        dep_codes >= 0, idx['dep_to_region'][dep_codes], -1
+    ).astype(np.int32)
+    return df
+
+
+def _geo_codes(df: pd.DataFrame, level: str, idx: dict):
+    """(codes entiers, libellés) pour un niveau géographique."""
+    if level == 'commune':
+        return pd.factorize(df['ville'])
+    if level == 'code_postal':
+        return pd.factorize(df['code_postal_norm'])
+    if level == 'departement':
+        return df['geo_departement'].to_numpy(), idx['departement_labels']
+    if level == 'region':
+        return df['geo_region'].to_numpy(), idx['region_labels']
+    raise ValueError(f"Niveau géographique inconnu : {level}")
+
+
+def compute_geo_rollups(df: pd.DataFrame) -> dict:
+    """
+    Pré-calcule, pour chaque niveau de `GEO_LEVELS`, les effectifs
+    barreau × unité géographique et l'indice de Herfindahl de chaque barreau.
+
+    Les effectifs sont stockés creux : une Series indexée par
+    (`row`, `unit`) ne contenant que les couples non nuls. La ligne
+    `len(barreaux)` (`'Tous'`) couvre l'ensemble des avocats ; le filtre
+    barreau se résout ensuite par simple lecture (cf. `geo_view`).
+    """
+    idx = load_geo_index()
+    bar_codes, barreaux = pd.factorize(df['barreau'])
+    n_bar = len(barreaux)
+    totals = np.append(np.bincount(bar_codes[bar_codes >= 0], minlength=n_bar),
+                       len(df)).astype(float)
+
+    levels = {}
+    for level in GEO_LEVELS:
+        codes, labels = _geo_codes(df, level, idx)
+        codes = np.asarray(codes, dtype=np.int64)
+        n_units = len(labels)
+        known = codes >= 0
+        both = known & (bar_codes >= 0)
+        pairs, n = np.unique(bar_codes[both] * n_units + codes[both],
+                             return_counts=True)
+        units_all, n_all = np.unique(codes[known], return_counts=True)
+        rows = np.concatenate([pairs // n_units, np.full(len(units_all), n_bar)])
+        units = np.concatenate([pairs % n_units, units_all])
+        counts = pd.Series(np.concatenate([n, n_all]),
+                           index=pd.MultiIndex.from_arrays([rows, units],
+                                                           names=['row', 'unit']))
+        shares = counts.to_numpy() / totals[rows]
+        herf = np.bincount(rows, weights=shares ** 2, minlength=n_bar + 1) * 100
+        levels[level] = {
+            'labels': np.asarray(labels, dtype=object),
+            'counts': counts,
+            'herfindahl': herf,
+        }
+    return {
+        'barreaux': {b: i for i, b in enumerate(list(barreaux) + ['Tous'])},
+        'levels': levels,
+    }
+
+
+def geo_view(rollups: dict, level: str = 'commune', barreau: str = 'Tous',
+             top: int = None) -> pd.DataFrame:
+    """Effectifs (`name`, `value`) d'un niveau géographique pour un barreau."""
+    row = rollups['barreaux'].get(barreau)
+    lvl = rollups['levels'][level]
+    if row is None:
+        return pd.DataFrame({'name': [], 'value': []})
+    # index trié par (row, unit) : tranche directe, vide si aucun effectif
+    counts = lvl['counts'].loc[row:row].droplevel('row')
+    counts = pd.Series(counts.to_numpy(), index=lvl['labels'][counts.index])
+    counts = counts.sort_values(ascending=False, kind='stable')
+    if top:
+        counts = counts.head(top)
+    return pd.DataFrame({'name': counts.index, 'value': counts.values})
+
+
+def geo_concentration(rollups: dict, level: str = 'commune',
+                      barreau: str = 'Tous') -> float:
+    """Indice de Herfindahl (%) pré-calculé, arrondi comme `concentration_geo`."""
+    row = rollups['barreaux'].get(barreau)
+    if row is None:
+        return 0.0
+    return round(float(rollups['levels'][level]['herfindahl'][row]), 1)
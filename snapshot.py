@@ -0,0 +1,317 @@
+"""snapshot.py – export statique du tableau de bord (HTML + JSON, sans serveur).
+
+Exécute le pipeline une seule fois par jeu de données et par barreau, puis
+sérialise KPI, tables et graphiques (specs Vega-Lite) dans un bundle
+consultable hors Streamlit et hors ligne (Vega embarqué), avec un
+sélecteur de barreau côté client :
+
+    python snapshot.py export_paris.xlsx export_lyon.csv -o snapshot/
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from data_utils import (GEO_LEVELS, compute_age_insights, compute_age_kpis,
+                        compute_statistics,
+                        geo_concentration, geo_view, load_and_merge,
+                        prepare_chart_data, process_data)
+from viz import (activites_chart, age_specialisation_chart,
+                 age_structure_chart, barreau_bar_chart, experience_pie,
+                 flux_entree_chart, gender_pie, langues_pie,
+                 specialisation_chart)
+
+# libellés des KPI, dans l'ordre d'affichage
+KPI_LABELS = {
+    'total': "Total Avocats",
+    'diversite_linguistique': "Diversité Linguistique (%)",
+    'taux_expertise': "Taux Expertise (%)",
+    'diversite_specialisation': "Multi-spécialistes (%)",
+    'avg_exp': "Expérience Moyenne (ans)",
+    'concentration_geo': "Concentration Géo (%)",
+    'taux_renouvellement': "Taux Renouvellement (%)",
+    'unique_cities': "Villes Actives",
+    'pct_no_specialisation': "Sans spécialisation (%)",
+    'pct_monolingues': "Monolingues (%)",
+    'pct_pre_retraite': "Quasi-retraités (%)",
+    'gini_barreaux': "Gini Barreaux",
+    'unique_barreaux': "Barreaux",
+    'shannon_specialisations': "Shannon spés.",
+    'pct_top3_barreaux': "% Top 3 Barreaux",
+    'pct_anciens': "% Anciens (>30 ans exp)",
+    'multilingues': "Avocats Multilingues",
+    'multispecialistes': "Multi-spécialistes",
+    'experts_confirmes': "Experts Confirmés (15+ ans)",
+    'jeunes_diplomes': "Jeunes Diplômés (≤5 ans)",
+    'pct_jeunes': "Jeunes (<30 ans) (%)",
+    'pct_structure_jeunes': "Part structure (<30 ans) (%)",
+    'pct_specialises_60plus': "Spécialisés 60 + (%)",
+}
+
+# graphiques scrollables (une barre par catégorie) : encadrés dans le HTML
+SCROLLABLE_CHARTS = {'specialisations', 'activites_dominantes'}
+
+
+def _jsonable(obj):
+    """Convertit récursivement numpy / pandas en types JSON (NaN → null)."""
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    return obj
+
+
+def _table(df: pd.DataFrame) -> dict:
+    """Table compacte : colonnes + lignes (pas de clés répétées)."""
+    return {
+        'columns': [str(c) for c in df.columns],
+        'rows': _jsonable(df.astype(object).values.tolist()),
+    }
+
+
+def build_view(df: pd.DataFrame, geo: dict, barreau: str = 'Tous') -> dict:
+    """KPI, tables et specs Vega-Lite d'un barreau (ou de l'ensemble)."""
+    stats = compute_statistics(df, geo, barreau)
+    struct_age, spec_age = compute_age_insights(df)
+    stats.update(compute_age_kpis(struct_age, spec_age))
+
+    charts = prepare_chart_data(df)
+    specs = {
+        'flux_entree': flux_entree_chart(charts['flux_entree']),
+        'barreau': barreau_bar_chart(charts['barreau']),
+        'langues': langues_pie(charts['langues']),
+        'specialisations': specialisation_chart(charts['specialisations']),
+        'experience': experience_pie(charts['experience']),
+        'activites_dominantes': activites_chart(charts['activites_dominantes']),
+        'gender': gender_pie(charts['gender']),
+        'age_structure': age_structure_chart(struct_age),
+        'age_specialisation': age_specialisation_chart(spec_age),
+    }
+
+    tables = {
+        f'geo_{level}': _table(
+            geo_view(geo, level, barreau, top=10)
+                .rename(columns={'name': label, 'value': 'Effectif'})
+        )
+        for level, label in GEO_LEVELS.items()
+    }
+    tables['concentration_geo'] = _table(pd.DataFrame({
+        'Niveau': list(GEO_LEVELS.values()),
+        'Concentration Géo (%)': [geo_concentration(geo, lvl, barreau)
+                                  for lvl in GEO_LEVELS],
+    }))
+    tables['age_structure'] = _table(struct_age.reset_index())
+    tables['age_specialisation'] = _table(spec_age.reset_index())
+
+    return {
+        'kpis': _jsonable(stats),
+        'tables': tables,
+        'charts': {name: _jsonable(chart.to_dict()) for name, chart in specs.items()},
+    }
+
+
+def build_snapshot(raw: pd.DataFrame, sources=()) -> dict:
+    """Exécute le pipeline une fois pour 'Tous' puis pour chaque barreau."""
+    df, geo = process_data(raw)
+    barreaux = sorted(df['barreau'].dropna().unique().tolist())
+
+    views = {'Tous': build_view(df, geo)}
+    for barreau in barreaux:
+        views[barreau] = build_view(df[df['barreau'] == barreau], geo, barreau)
+
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'sources': list(sources),
+        'kpi_labels': KPI_LABELS,
+        'geo_levels': GEO_LEVELS,
+        'scrollable_charts': sorted(SCROLLABLE_CHARTS),
+        'barreaux': ['Tous'] + barreaux,
+        'views': views,
+    }
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>Annuaire des Avocats – instantané</title>
+{scripts}
+<style>
+  body {{ font-family: sans-serif; margin: 2rem; color: #262730; }}
+  .kpis {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; }}
+  .kpi {{ padding: .5rem; }}
+  .kpi .label {{ font-size: .85rem; color: #555; }}
+  .kpi .value {{ font-size: 1.8rem; }}
+  .charts {{ display: grid; grid-template-columns: 1fr 1fr; gap: 1.5rem; }}
+  .scroll {{ border: 1px solid #ddd; border-radius: 4px; padding: 8px;
+            height: 300px; overflow: auto; }}
+  table {{ border-collapse: collapse; margin: .5rem 0 1.5rem; }}
+  td, th {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; }}
+  hr {{ margin: 2rem 0; }}
+</style>
+</head>
+<body>
+<h1>Annuaire des Avocats</h1>
+<p>Instantané généré le <span id="generated"></span>.
+   Barreau : <select id="barreau"></select></p>
+<div class="kpis" id="kpis"></div>
+<hr>
+<div id="flux_entree"></div>
+<hr>
+<h2>Visualisations</h2>
+<div class="charts" id="charts"></div>
+<hr>
+<h2>Tables</h2>
+<div id="tables"></div>
+<script id="snapshot" type="application/json">{data}</script>
+<script>
+const snap = JSON.parse(document.getElementById('snapshot').textContent);
+const select = document.getElementById('barreau');
+document.getElementById('generated').textContent = snap.generated;
+for (const b of snap.barreaux) {{
+  const opt = document.createElement('option');
+  opt.value = opt.textContent = b;
+  select.appendChild(opt);
+}}
+
+// valeurs issues des exports : insérées via textContent, jamais en HTML
+function el(tag, text, className) {{
+  const node = document.createElement(tag);
+  if (text !== undefined) node.textContent = text === null ? '' : String(text);
+  if (className) node.className = className;
+  return node;
+}}
+
+function renderTable(name, table) {{
+  const frag = document.createDocumentFragment();
+  frag.appendChild(el('h3', name));
+  const tbl = el('table');
+  const head = el('tr');
+  for (const c of table.columns) head.appendChild(el('th', c));
+  tbl.appendChild(head);
+  for (const r of table.rows) {{
+    const tr = el('tr');
+    for (const v of r) tr.appendChild(el('td', v));
+    tbl.appendChild(tr);
+  }}
+  frag.appendChild(tbl);
+  return frag;
+}}
+
+function render(barreau) {{
+  const view = snap.views[barreau];
+  const kpis = document.getElementById('kpis');
+  kpis.replaceChildren();
+  for (const [key, label] of Object.entries(snap.kpi_labels)) {{
+    if (!(key in view.kpis)) continue;
+    const div = el('div', undefined, 'kpi');
+    div.appendChild(el('div', label, 'label'));
+    div.appendChild(el('div', view.kpis[key] ?? '–', 'value'));
+    kpis.appendChild(div);
+  }}
+
+  vegaEmbed('#flux_entree', view.charts.flux_entree, {{actions: false}});
+  const charts = document.getElementById('charts');
+  charts.replaceChildren();
+  for (const [name, spec] of Object.entries(view.charts)) {{
+    if (name === 'flux_entree') continue;
+    const div = el('div');
+    if (snap.scrollable_charts.includes(name)) div.className = 'scroll';
+    charts.appendChild(div);
+    vegaEmbed(div, spec, {{actions: false}});
+  }}
+
+  const tables = document.getElementById('tables');
+  tables.replaceChildren();
+  for (const [name, table] of Object.entries(view.tables)) {{
+    tables.appendChild(renderTable(name, table));
+  }}
+}}
+
+select.addEventListener('change', () => render(select.value));
+render(select.value);
+</script>
+</body>
+</html>
+"""
+
+
+JS_BUNDLE = 'vega-bundle.js'
+
+CDN_SCRIPTS = '\n'.join(
+    f'<script src="https://cdn.jsdelivr.net/npm/{lib}@{version}"></script>'
+    for lib, version in [('vega', alt.VEGA_VERSION),
+                         ('vega-lite', alt.VEGALITE_VERSION),
+                         ('vega-embed', alt.VEGAEMBED_VERSION)]
+)
+
+
+def _vega_bundle() -> str:
+    """Vega + Vega-Lite + Vega-Embed en un seul script (via vl-convert)."""
+    try:
+        import vl_convert as vlc
+    except ImportError as e:
+        raise ImportError(
+            "vl-convert-python est requis pour embarquer Vega dans le bundle "
+            "(pip install vl-convert-python), ou utilisez --cdn."
+        ) from e
+    vl_version = '_'.join(alt.SCHEMA_VERSION.split('.')[:2])   # 'v6.4.1' → 'v6_4'
+    return vlc.javascript_bundle(vl_version=vl_version)
+
+
+def write_bundle(snapshot: dict, out_dir, cdn: bool = False) -> Path:
+    """
+    Écrit `snapshot.json` et un `index.html` (données embarquées).
+
+    Par défaut les bibliothèques Vega sont copiées dans le dossier
+    (`vega-bundle.js`) : le bundle fonctionne hors ligne / sans accès au CDN.
+    Avec `cdn=True`, elles sont chargées depuis jsdelivr.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if cdn:
+        scripts = CDN_SCRIPTS
+    else:
+        (out_dir / JS_BUNDLE).write_text(_vega_bundle(), encoding='utf-8')
+        scripts = f'<script src="{JS_BUNDLE}"></script>'
+    data = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))
+    (out_dir / 'snapshot.json').write_text(data, encoding='utf-8')
+    html = HTML_TEMPLATE.format(scripts=scripts, data=data.replace('</', '<\\/'))
+    index = out_dir / 'index.html'
+    index.write_text(html, encoding='utf-8')
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Exporte un instantané statique (HTML + JSON) du tableau de bord."
+    )
+    parser.add_argument('files', nargs='+', help="Exports Excel / CSV à fusionner")
+    parser.add_argument('-o', '--out', default='snapshot',
+                        help="Dossier de sortie (défaut : snapshot/)")
+    parser.add_argument('--cdn', action='store_true',
+                        help="Charger Vega depuis le CDN au lieu de l'embarquer")
+    args = parser.parse_args(argv)
+
+    raw, timings = load_and_merge(args.files)
+    print(timings.to_string(index=False))
+    snapshot = build_snapshot(raw, sources=[Path(f).name for f in args.files])
+    index = write_bundle(snapshot, args.out, cdn=args.cdn)
+    print(f"{len(snapshot['barreaux'])} vues exportées → {index}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
 from datetime import datetime
 import streamlit.components.v1 as components
 import numpy as np 
 
-from data_utils import compute_statistics, gini, process_data, prepare_chart_data, compute_age_insights
+from data_utils import compute_statistics, gini, process_data, prepare_chart_data, compute_age_insights, compute_age_kpis, load_and_merge
+from data_utils import GEO_LEVELS, geo_view, geo_concentration
 from viz import show_specialisation_chart, show_activites_chart, langues_pie, experience_pie, gender_pie, show_flux_entree_chart
+from viz import barreau_bar_chart, age_structure_chart, age_specialisation_chart
 
 
 # ------------------------------
@@ -20,33 +21,37 @@ def main():
 
     # Sidebar
     uploaded = st.sidebar.file_uploader(
-        "📁 Choisir un fichier Excel / CSV", type=['xlsx', 'xls', 'csv']
+        "📁 Choisir un ou plusieurs fichiers Excel / CSV",
+        type=['xlsx', 'xls', 'csv'],
+        accept_multiple_files=True,
     )
     if not uploaded:
         st.sidebar.info("Importez vos données pour démarrer.")
         return
 
-    # Lecture
+    # Lecture (parallèle si plusieurs exports) + fusion
     try:
-        if uploaded.name.lower().endswith('.csv'):
-            raw = pd.read_csv(uploaded)
-        else:
-            raw = pd.read_excel(uploaded)
+        raw, timings = load_and_merge(uploaded)
     except Exception as e:
         st.sidebar.error(f"Erreur lecture fichier : {e}")
         return
+    with st.sidebar.expander("⏱️ Lecture des fichiers", expanded=False):
+        st.dataframe(timings, hide_index=True)
+        st.caption(f"{len(raw)} avocats après fusion et dédoublonnage "
+                   f"({int(timings['lignes'].sum())} lignes lues).")
 
-    df = process_data(raw)
-
+    df, geo = process_data(raw)
 
     # Filtre barreau
     barreaux = ['Tous'] + sorted(df['barreau'].dropna().unique().tolist())
     sel = st.sidebar.selectbox("Filtrer par Barreau", barreaux)
     if sel != 'Tous':
         df = df[df['barreau'] == sel]
+    niveau = st.sidebar.selectbox("Granularité géographique", list(GEO_LEVELS),
+                                  format_func=GEO_LEVELS.get)
 
     # Statistiques
-    stats = compute_statistics(df)
+    stats = compute_statistics(df, geo, sel, niveau)
     struct_age, spec_age = compute_age_insights(df)
 
     # KPI principaux
@@ -69,7 +74,7 @@ def main():
     k6.metric(
          label="Concentration Géo (%)",
          value=stats['concentration_geo'],
-         help="Indice de Herfindahl régional : plus il est élevé, plus la répartition est concentrée dans quelques villes."
+         help=f"Indice de Herfindahl ({GEO_LEVELS[niveau].lower()}) : plus il est élevé, plus la répartition est concentrée dans quelques unités géographiques."
      )
     k7.metric("Taux Renouvellement (%)", stats['taux_renouvellement'])
     k8.metric("Villes Actives", stats['unique_cities'])
@@ -83,15 +88,13 @@ def main():
 
     with st.expander("👤 Démographie par tranche d'âge", expanded=False):
         a1, a2, a3 = st.columns(3)
-        # pourcentage de -30 ans
-        pct_jeunes = (
-            struct_age.loc['<30'].sum() / struct_age.sum().sum() * 100
-        ).round(1)
-        a1.metric("Jeunes (<30 ans)", f"{pct_jeunes} %")
+        age_kpis = compute_age_kpis(struct_age, spec_age)
+        pct = lambda v: "–" if pd.isna(v) else f"{v} %"
+        a1.metric("Jeunes (<30 ans)", pct(age_kpis['pct_jeunes']))
         a2.metric("Part structure (<30 ans)",
-                  f"{struct_age.loc['<30','% Structure']} %")
+                  pct(age_kpis['pct_structure_jeunes']))
         a3.metric("Spécialisés 60 +", 
-                  f"{spec_age.loc['60+','% Spécialisés']} %")
+                  pct(age_kpis['pct_specialises_60plus']))
 
 
 
@@ -126,23 +129,7 @@ def main():
     # Row 1: Barreaux & Langues
     c1, c2 = st.columns(2)
     with c1:
-        dfb = charts['barreau']
-        bar = (
-            alt.Chart(dfb)
-               .transform_calculate(Note="'Top 8 barreaux'")
-               .mark_bar()
-               .encode(
-                   x=alt.X('name:N', sort='-y', title='Barreau'),
-                   y=alt.Y('value:Q', title='Nombre'),
-                   tooltip=[
-                       alt.Tooltip('name:N', title='Barreau'),
-                       alt.Tooltip('value:Q', title='Effectif'),
-                       alt.Tooltip('Note:N', title='Note')
-                   ]
-               )
-               .properties(height=250)
-        )
-        st.altair_chart(bar, use_container_width=True)
+        st.altair_chart(barreau_bar_chart(charts['barreau']), use_container_width=True)
 
     with c2:
         dfl = charts['langues']
@@ -170,50 +157,10 @@ def main():
 
 
     c7, c8 = st.columns(2)
-    order = ['<30', '30-39', '40-49', '50-59', '60+']
-
     with c7:
-        # Bar empilée Structure vs Solo
-        chart_struct = (
-            struct_age.reset_index()
-                      .melt(id_vars='age_bracket', value_vars=['Solo','Structure'])
-        )
-        base = struct_age.reset_index()              # garde les colonnes 'age_bracket', 'Solo', 'Structure'
-
-        st.altair_chart(
-            alt.Chart(base)
-               .transform_fold(                     # on plie les deux colonnes côté Vega-Lite
-                   ['Solo', 'Structure'],
-                   as_=['Statut', 'Effectif']
-               )
-               .mark_bar()
-               .encode(
-                   x=alt.X('age_bracket:N', title="Tranche d'âge", sort=order),
-                   y=alt.Y('Effectif:Q', stack='normalize', title='%'),
-                   color=alt.Color('Statut:N', title='Statut'),
-                   tooltip=['age_bracket:N', 'Statut:N', 'Effectif:Q']
-               )
-               .properties(height=250, title={"text": "Répartition Solo vs Structure par tranche d'âge"}),
-            use_container_width=True
-        )
-
-      
+        st.altair_chart(age_structure_chart(struct_age), use_container_width=True)
     with c8:
-        # Bar simple % spécialisés
-        chart_spec = spec_age.reset_index()[['age_bracket','% Spécialisés']]
-        st.altair_chart(
-            alt.Chart(chart_spec)
-               .mark_bar()
-               .encode(
-                   x=alt.X('age_bracket:N', title="Tranche d'âge", sort=order),
-                   y='% Spécialisés:Q',
-                   tooltip=['age_bracket','% Spécialisés'],
-               )
-               .properties(height=250, title={"text": "% d'individus spécialisés par tranche d'âge"}),
-            use_container_width=True
-        )
-
-
+        st.altair_chart(age_specialisation_chart(spec_age), use_container_width=True)
 
 
     # Analyse géographique
@@ -221,17 +168,16 @@ def main():
     st.subheader("Analyse Géographique Détaillée")
     gv, gr = st.columns([1, 1])
     with gv:
-        top_villes = df['ville'].value_counts().head(5)
         st.table(
-            top_villes.reset_index()
-                      .rename(columns={'index': 'Ville', 'ville': 'Ville'})
+            geo_view(geo, niveau, sel, top=10)
+                .rename(columns={'name': GEO_LEVELS[niveau], 'value': 'Effectif'})
         )
     with gr:
-        regions = df['code_postal'].dropna().astype(str).str[:5].value_counts().head(10)
-        st.table(
-            regions.reset_index()
-                   .rename(columns={'index': 'Région', 'code_postal': 'Code Postal'})
-        )
+        st.table(pd.DataFrame({
+            'Niveau': list(GEO_LEVELS.values()),
+            'Concentration Géo (%)': [geo_concentration(geo, lvl, sel)
+                                      for lvl in GEO_LEVELS],
+        }))
 
     # Insights & Tendances
     st.markdown("---")
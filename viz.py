@@ -7,22 +7,23 @@ import streamlit as st
 import streamlit.components.v1 as components
 from functools import partial
 
+from data_utils import AGE_BRACKETS
+
 # palette sobre - bleu / saumon / gris (complétez ou changez à volonté)
 _PIE_DOMAIN = ['male', 'female', '?']          # ex. pour le pie Genre
 _PIE_RANGE  = ['#4F6EEB', '#F9A875', '#BBBBBB']
 
 
-def show_scrollable_bar_chart(
+def scrollable_bar_chart(
     df: pd.DataFrame,
     note: str,
     y_title: str,
     tooltip_label: str,
-    height_px: int = 320,
     bar_size: int = 18
-) -> None:
-    '''Affiche un bar chart vertical scrollable dans Streamlit.'''
+) -> alt.Chart:
+    '''Bar chart vertical (une ligne par catégorie), hauteur proportionnelle.'''
     count = df.shape[0]
-    chart = (
+    return (
         alt.Chart(df)
            .transform_calculate(Note=f"'{note}'")
            .mark_bar(size=bar_size)
@@ -42,6 +43,23 @@ def show_scrollable_bar_chart(
            )
            .properties(height=count * 22, width=400)
     )
+
+
+def show_scrollable_bar_chart(
+    df: pd.DataFrame,
+    note: str,
+    y_title: str,
+    tooltip_label: str,
+    height_px: int = 320,
+    bar_size: int = 18
+) -> None:
+    '''Affiche un bar chart vertical scrollable dans Streamlit.'''
+    chart = scrollable_bar_chart(df, note, y_title, tooltip_label, bar_size)
+    show_scrollable_chart(chart, height_px)
+
+
+def show_scrollable_chart(chart: alt.Chart, height_px: int = 320) -> None:
+    '''Affiche un chart Altair dans une DIV scrollable (composant HTML).'''
     components.html(
         wrap_with_scroll(chart.to_html(), height=height_px - 20),
         height=height_px,
@@ -122,10 +140,79 @@ gender_pie      = partial(
 
 
 
+specialisation_chart = partial(
+    scrollable_bar_chart,
+    note='Répartition de toutes les spécialisations',
+    y_title='Spécialisation',
+    tooltip_label='Spécialisation',
+)
+
+activites_chart = partial(
+    scrollable_bar_chart,
+    note='Répartition de toutes les Activités',
+    y_title='Activité Dominante',
+    tooltip_label='Activité Dominante',
+)
+
+
 def show_specialisation_chart(dfs: pd.DataFrame):
-    show_scrollable_bar_chart(dfs,note='Répartition de toutes les spécialisations',y_title='Spécialisation',tooltip_label='Spécialisation')
+    show_scrollable_chart(specialisation_chart(dfs))
 def show_activites_chart(dfs: pd.DataFrame):
-    show_scrollable_bar_chart(dfs,note='Répartition de toutes les Activités',y_title='Activité Dominante',tooltip_label='Activité Dominante')
+    show_scrollable_chart(activites_chart(dfs))
+
+
+def barreau_bar_chart(dfb: pd.DataFrame) -> alt.Chart:
+    """Bar chart des 8 premiers barreaux."""
+    return (
+        alt.Chart(dfb)
+           .transform_calculate(Note="'Top 8 barreaux'")
+           .mark_bar()
+           .encode(
+               x=alt.X('name:N', sort='-y', title='Barreau'),
+               y=alt.Y('value:Q', title='Nombre'),
+               tooltip=[
+                   alt.Tooltip('name:N', title='Barreau'),
+                   alt.Tooltip('value:Q', title='Effectif'),
+                   alt.Tooltip('Note:N', title='Note')
+               ]
+           )
+           .properties(height=250)
+    )
+
+
+def age_structure_chart(struct_age: pd.DataFrame) -> alt.Chart:
+    """Bar empilée (normalisée) Solo vs Structure par tranche d'âge."""
+    base = struct_age.reset_index()              # garde les colonnes 'age_bracket', 'Solo', 'Structure'
+    return (
+        alt.Chart(base)
+           .transform_fold(                     # on plie les deux colonnes côté Vega-Lite
+               ['Solo', 'Structure'],
+               as_=['Statut', 'Effectif']
+           )
+           .mark_bar()
+           .encode(
+               x=alt.X('age_bracket:N', title="Tranche d'âge", sort=AGE_BRACKETS),
+               y=alt.Y('Effectif:Q', stack='normalize', title='%'),
+               color=alt.Color('Statut:N', title='Statut'),
+               tooltip=['age_bracket:N', 'Statut:N', 'Effectif:Q']
+           )
+           .properties(height=250, title={"text": "Répartition Solo vs Structure par tranche d'âge"})
+    )
+
+
+def age_specialisation_chart(spec_age: pd.DataFrame) -> alt.Chart:
+    """Bar simple : % de spécialisés par tranche d'âge."""
+    chart_spec = spec_age.reset_index()[['age_bracket', '% Spécialisés']]
+    return (
+        alt.Chart(chart_spec)
+           .mark_bar()
+           .encode(
+               x=alt.X('age_bracket:N', title="Tranche d'âge", sort=AGE_BRACKETS),
+               y='% Spécialisés:Q',
+               tooltip=['age_bracket', '% Spécialisés'],
+           )
+           .properties(height=250, title={"text": "% d'individus spécialisés par tranche d'âge"})
+    )
 
 
 def wrap_with_scroll(html: str, height: int = 300) -> str:
@@ -143,14 +230,14 @@ def wrap_with_scroll(html: str, height: int = 300) -> str:
     """
 
 
-def show_flux_entree_chart(
+def flux_entree_chart(
     df: pd.DataFrame,
     note: str = "",
     tooltip_label: str = "Année",
     height_px: int = 350,
     width_px: int = 800,
-) -> None:
-
+) -> alt.LayerChart:
+    """Aire + ligne + points des admissions par année de serment."""
     base = (
         alt.Chart(df)
            .transform_calculate(Note=f"'{note}'")
@@ -175,9 +262,19 @@ def show_flux_entree_chart(
     line = base.mark_line(color="#4C78A8", strokeWidth=2)
     pts  = base.mark_point(color="#4C78A8", size=50)
 
-    chart = (area + line + pts).properties(width=width_px,
-                                           height=height_px,
-                                           title="Flux d’entrée au barreau").interactive()
+    return (area + line + pts).properties(width=width_px,
+                                          height=height_px,
+                                          title="Flux d’entrée au barreau").interactive()
+
+
+def show_flux_entree_chart(
+    df: pd.DataFrame,
+    note: str = "",
+    tooltip_label: str = "Année",
+    height_px: int = 350,
+    width_px: int = 800,
+) -> None:
+    chart = flux_entree_chart(df, note, tooltip_label, height_px, width_px)
 
     # plus de composant HTML scrollable
     st.altair_chart(chart, use_container_width=False)